@@ -8,6 +8,10 @@
 #include <vector>
 #include <iostream>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 inline void coreassert(const bool istrue, const std::string &errormsg){
     if (!istrue){
         throw std::runtime_error("pyamg-error (amg_core) -- " + errormsg);
@@ -568,16 +572,25 @@ void bellman_ford(const I num_nodes,
                         T  d[], const int  d_size,
                         I cm[], const int cm_size)
 {
+  const bool has_inf = std::numeric_limits<T>::has_infinity;
+  const T inf = std::numeric_limits<T>::infinity();
   bool done = false;
 
   while (!done) {
     done = true;
     for(I i = 0; i < num_nodes; i++){
+      // d[i] and cm[i] are fixed while the edges out of i are relaxed
+      const T di = d[i];
+      const I ci = cm[i];
+      if(has_inf && di == inf){
+        continue; // not reached yet, nothing to relax
+      }
       for(I jj = Ap[i]; jj < Ap[i+1]; jj++){
-        I j = Aj[jj];
-        if(d[i] + Ax[jj] < d[j]){
-          d[j] = d[i] + Ax[jj];
-          cm[j] = cm[i];
+        const I j = Aj[jj];
+        const T dj = di + Ax[jj];
+        if(dj < d[j]){
+          d[j] = dj;
+          cm[j] = ci;
           done = false; // found a change, keep going
         }
       }
@@ -586,6 +599,117 @@ void bellman_ford(const I num_nodes,
 }
 
 
+/*
+ * Apply Bellman-Ford from several sources at once on a distance
+ * graph stored in CSR format.
+ *
+ * Column k of d holds the distances from source k.  Each edge is loaded
+ * once per sweep and relaxed for a block of sources; d is stored row-major
+ * so the loop over sources is unit stride and branch free, which lets the
+ * compiler vectorize it.
+ *
+ * A row is relaxed only when its distances changed since it was last
+ * relaxed, so unreached and settled rows are skipped.  Sweeps alternate
+ * between forward and backward order, so a distance crosses a path in
+ * either direction of the node numbering in one sweep rather than one
+ * edge per sweep.
+ *
+ * The sources are independent, so when built with OpenMP the columns of d
+ * are split into one block per thread.  Each thread owns its columns and
+ * iterates to convergence on its own: no atomics, locks, or barriers.
+ *
+ *  Parameters
+ *      num_nodes   - (IN)    number of nodes (number of rows in A)
+ *      num_sources - (IN)    number of sources (number of columns in d)
+ *      Ap[]        - (IN)    CSR row pointer
+ *      Aj[]        - (IN)    CSR index array
+ *      Ax[]        - (IN)    CSR data array (edge lengths)
+ *      d[]         - (INOUT) num_nodes x num_sources distances (row-major)
+ *
+ *  Notes
+ *      d[c[k]*num_sources + k] = 0 for source c[k] and all other
+ *      entries are initialized to infinity.
+ *
+ *  References:
+ *      http://en.wikipedia.org/wiki/Bellman-Ford_algorithm
+ */
+template<class I, class T>
+void bellman_ford_multi(const I num_nodes,
+                        const I num_sources,
+                        const I Ap[], const int Ap_size,
+                        const I Aj[], const int Aj_size,
+                        const T Ax[], const int Ax_size,
+                              T  d[], const int  d_size)
+{
+  if(num_sources == 0){
+    return;
+  }
+
+  I num_blocks = 1;
+#ifdef _OPENMP
+  num_blocks = omp_get_max_threads();
+#endif
+
+  // round the block width up to whole cache lines to limit false sharing
+  const I line = std::max<I>(1, 64 / sizeof(T));
+  I width = (num_sources + num_blocks - 1) / num_blocks;
+  width = ((width + line - 1) / line) * line;
+  num_blocks = (num_sources + width - 1) / width;
+
+  #pragma omp parallel for schedule(static)
+  for(I b = 0; b < num_blocks; b++){
+    const I k_start = b * width;
+    const I k_end = std::min(k_start + width, num_sources);
+
+    // a row is relaxed only if its distances in this block changed since
+    // it was last relaxed; at the start only the sources have changed
+    std::vector<char> active(num_nodes, 0);
+    for(I i = 0; i < num_nodes; i++){
+      const T * di = d + i * num_sources;
+      for(I k = k_start; k < k_end; k++){
+        if(di[k] == 0){
+          active[i] = 1;
+          break;
+        }
+      }
+    }
+
+    // sweep alternately forward and backward, so that distances travel
+    // along paths toward both higher and lower node numbers in one pass
+    bool done = false;
+    bool forward = true;
+    while (!done) {
+      done = true;
+      for(I n = 0; n < num_nodes; n++){
+        const I i = forward ? n : num_nodes - 1 - n;
+        if(!active[i]){
+          continue; // unreached or unchanged, nothing new to relax
+        }
+        active[i] = 0;
+        const T * di = d + i * num_sources;
+        for(I jj = Ap[i]; jj < Ap[i+1]; jj++){
+          const I j = Aj[jj];
+          T * dj = d + j * num_sources;
+          const T w = Ax[jj];
+          bool changed = false;
+          for(I k = k_start; k < k_end; k++){
+            const T t = di[k] + w;
+            const bool relax = t < dj[k];
+            dj[k] = relax ? t : dj[k];
+            changed |= relax;
+          }
+          if(changed){
+            active[j] = 1;
+            done = false; // found a change, keep going
+          }
+        }
+      }
+      forward = !forward;
+    }
+  }
+}
+
+
 /*
  * Apply Bellman-Ford with a heuristic to balance cluster sizes
  *
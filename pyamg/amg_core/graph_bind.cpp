@@ -252,6 +252,35 @@ void _bellman_ford(
                               );
 }
 
+template<class I, class T>
+void _bellman_ford_multi(
+        const I num_nodes,
+      const I num_sources,
+      py::array_t<I> & Ap,
+      py::array_t<I> & Aj,
+      py::array_t<T> & Ax,
+       py::array_t<T> & d
+                         )
+{
+    auto py_Ap = Ap.unchecked();
+    auto py_Aj = Aj.unchecked();
+    auto py_Ax = Ax.unchecked();
+    auto py_d = d.mutable_unchecked();
+    const I *_Ap = py_Ap.data();
+    const I *_Aj = py_Aj.data();
+    const T *_Ax = py_Ax.data();
+    T *_d = py_d.mutable_data();
+
+    return bellman_ford_multi<I, T>(
+                num_nodes,
+              num_sources,
+                      _Ap, Ap.shape(0),
+                      _Aj, Aj.shape(0),
+                      _Ax, Ax.shape(0),
+                       _d, d.shape(0)
+                                    );
+}
+
 template<class I, class T>
 void _lloyd_cluster(
         const I num_nodes,
@@ -422,6 +451,7 @@ PYBIND11_MODULE(graph, m) {
     cluster_node_incidence
     cluster_center
     bellman_ford
+    bellman_ford_multi
     lloyd_cluster
     lloyd_cluster_exact
     maximal_independent_set_k_parallel
@@ -626,6 +656,46 @@ graph stored in CSR format.
      d[]       - (INOUT) distance to nearest center
     cm[]       - (INOUT) cluster index for each node
 
+ References:
+     http://en.wikipedia.org/wiki/Bellman-Ford_algorithm)pbdoc");
+
+    m.def("bellman_ford_multi", &_bellman_ford_multi<int, int>,
+        py::arg("num_nodes"), py::arg("num_sources"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("d").noconvert());
+    m.def("bellman_ford_multi", &_bellman_ford_multi<int, float>,
+        py::arg("num_nodes"), py::arg("num_sources"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("d").noconvert());
+    m.def("bellman_ford_multi", &_bellman_ford_multi<int, double>,
+        py::arg("num_nodes"), py::arg("num_sources"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("d").noconvert(),
+R"pbdoc(
+Apply Bellman-Ford from several sources at once on a distance
+graph stored in CSR format.
+
+Column k of d holds the distances from source k.  Each edge is loaded
+once per sweep and relaxed for a block of sources; d is stored row-major
+so the loop over sources is unit stride and branch free, which lets the
+compiler vectorize it.
+
+A row is relaxed only when its distances changed since it was last
+relaxed, so unreached and settled rows are skipped.  Sweeps alternate
+between forward and backward order, so a distance crosses a path in
+either direction of the node numbering in one sweep rather than one
+edge per sweep.
+
+The sources are independent, so when built with OpenMP the columns of d
+are split into one block per thread.  Each thread owns its columns and
+iterates to convergence on its own: no atomics, locks, or barriers.
+
+ Parameters
+     num_nodes   - (IN)    number of nodes (number of rows in A)
+     num_sources - (IN)    number of sources (number of columns in d)
+     Ap[]        - (IN)    CSR row pointer
+     Aj[]        - (IN)    CSR index array
+     Ax[]        - (IN)    CSR data array (edge lengths)
+     d[]         - (INOUT) num_nodes x num_sources distances (row-major)
+
+ Notes
+     d[c[k]*num_sources + k] = 0 for source c[k] and all other
+     entries are initialized to infinity.
+
  References:
      http://en.wikipedia.org/wiki/Bellman-Ford_algorithm)pbdoc");
 
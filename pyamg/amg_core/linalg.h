@@ -5,6 +5,7 @@
 #include <limits>
 #include <complex>
 #include <iostream>
+#include <vector>
 
 /*******************************************************************
  * Overloaded routines for real arithmetic for int, float and double
@@ -1000,4 +1001,114 @@ void csc_scale_rows(const I n_row,
     }
 }
 
+
+/*
+ * Compute the residual of a CSR matrix in a single pass
+ *
+ *   R = B - A*X
+ *
+ * Fusing the matvec and the subtraction avoids the temporary A*X and a
+ * second pass over the vectors.
+ *
+ */
+template <class I, class T>
+void csr_residual(const I n_row,
+                  const I Ap[], const int Ap_size,
+                  const I Aj[], const int Aj_size,
+                  const T Ax[], const int Ax_size,
+                  const T Xx[], const int Xx_size,
+                  const T Bx[], const int Bx_size,
+                        T Rx[], const int Rx_size)
+{
+    for(I i = 0; i < n_row; i++){
+        T sum = Bx[i];
+        for(I jj = Ap[i]; jj < Ap[i+1]; jj++){
+            sum -= Ax[jj] * Xx[Aj[jj]];
+        }
+        Rx[i] = sum;
+    }
+}
+
+/*
+ * Compute the 2-norm of the residual of a CSR matrix in a single pass
+ *
+ *   ||B - A*X||
+ *
+ * Each residual entry is formed, squared and accumulated in place, so
+ * unlike csr_residual nothing is written back.  This is all the solve loop
+ * needs for its convergence test.
+ *
+ */
+template <class I, class T, class F>
+F csr_residual_norm(const I n_row,
+                    const I Ap[], const int Ap_size,
+                    const I Aj[], const int Aj_size,
+                    const T Ax[], const int Ax_size,
+                    const T Xx[], const int Xx_size,
+                    const T Bx[], const int Bx_size)
+{
+    F normsq = 0.0;
+    for(I i = 0; i < n_row; i++){
+        T sum = Bx[i];
+        for(I jj = Ap[i]; jj < Ap[i+1]; jj++){
+            sum -= Ax[jj] * Xx[Aj[jj]];
+        }
+        normsq += real(conjugate(sum) * sum);
+    }
+    return std::sqrt(normsq);
+}
+
+/*
+ * Numeric phase of the sparse matrix product C = A*B for CSR matrices
+ *
+ * The structure of C, given by Cp and Cj, must contain that of A*B, for
+ * instance from an earlier product of matrices with the same structure.
+ * Only the values Cx are computed, so when A and B change values but not
+ * structure, as for the Galerkin products R*A*P of a hierarchy, the
+ * symbolic phase is not repeated.
+ *
+ * Parameters
+ * ----------
+ * n_row, n_col : int
+ *      Dimensions of C
+ * Ap, Aj, Ax : array
+ *      CSR representation of A
+ * Bp, Bj, Bx : array
+ *      CSR representation of B
+ * Cp, Cj : array
+ *      Row pointer and column index arrays of C
+ * Cx : array
+ *      Values of C, overwritten
+ *
+ */
+template <class I, class T>
+void csr_matmat_numeric(const I n_row,
+                        const I n_col,
+                        const I Ap[], const int Ap_size,
+                        const I Aj[], const int Aj_size,
+                        const T Ax[], const int Ax_size,
+                        const I Bp[], const int Bp_size,
+                        const I Bj[], const int Bj_size,
+                        const T Bx[], const int Bx_size,
+                        const I Cp[], const int Cp_size,
+                        const I Cj[], const int Cj_size,
+                              T Cx[], const int Cx_size)
+{
+    // position in Cx of each column of the current row of C
+    std::vector<I> pos(n_col);
+    for(I i = 0; i < n_row; i++){
+        for(I jj = Cp[i]; jj < Cp[i+1]; jj++){
+            pos[Cj[jj]] = jj;
+            Cx[jj] = 0.0;
+        }
+        for(I jj = Ap[i]; jj < Ap[i+1]; jj++){
+            const I k = Aj[jj];
+            const T a = Ax[jj];
+            for(I kk = Bp[k]; kk < Bp[k+1]; kk++){
+                Cx[pos[Bj[kk]]] += a * Bx[kk];
+            }
+        }
+    }
+}
+
 #endif
@@ -85,6 +85,121 @@ void _csc_scale_rows(
                                  );
 }
 
+template <class I, class T>
+void _csr_residual(
+            const I n_row,
+      py::array_t<I> & Ap,
+      py::array_t<I> & Aj,
+      py::array_t<T> & Ax,
+      py::array_t<T> & Xx,
+      py::array_t<T> & Bx,
+      py::array_t<T> & Rx
+                   )
+{
+    auto py_Ap = Ap.unchecked();
+    auto py_Aj = Aj.unchecked();
+    auto py_Ax = Ax.unchecked();
+    auto py_Xx = Xx.unchecked();
+    auto py_Bx = Bx.unchecked();
+    auto py_Rx = Rx.mutable_unchecked();
+    const I *_Ap = py_Ap.data();
+    const I *_Aj = py_Aj.data();
+    const T *_Ax = py_Ax.data();
+    const T *_Xx = py_Xx.data();
+    const T *_Bx = py_Bx.data();
+    T *_Rx = py_Rx.mutable_data();
+
+    return csr_residual <I, T>(
+                    n_row,
+                      _Ap, Ap.shape(0),
+                      _Aj, Aj.shape(0),
+                      _Ax, Ax.shape(0),
+                      _Xx, Xx.shape(0),
+                      _Bx, Bx.shape(0),
+                      _Rx, Rx.shape(0)
+                               );
+}
+
+template <class I, class T, class F>
+F _csr_residual_norm(
+            const I n_row,
+      py::array_t<I> & Ap,
+      py::array_t<I> & Aj,
+      py::array_t<T> & Ax,
+      py::array_t<T> & Xx,
+      py::array_t<T> & Bx
+                     )
+{
+    auto py_Ap = Ap.unchecked();
+    auto py_Aj = Aj.unchecked();
+    auto py_Ax = Ax.unchecked();
+    auto py_Xx = Xx.unchecked();
+    auto py_Bx = Bx.unchecked();
+    const I *_Ap = py_Ap.data();
+    const I *_Aj = py_Aj.data();
+    const T *_Ax = py_Ax.data();
+    const T *_Xx = py_Xx.data();
+    const T *_Bx = py_Bx.data();
+
+    return csr_residual_norm <I, T, F>(
+                    n_row,
+                      _Ap, Ap.shape(0),
+                      _Aj, Aj.shape(0),
+                      _Ax, Ax.shape(0),
+                      _Xx, Xx.shape(0),
+                      _Bx, Bx.shape(0)
+                                       );
+}
+
+template <class I, class T>
+void _csr_matmat_numeric(
+            const I n_row,
+            const I n_col,
+      py::array_t<I> & Ap,
+      py::array_t<I> & Aj,
+      py::array_t<T> & Ax,
+      py::array_t<I> & Bp,
+      py::array_t<I> & Bj,
+      py::array_t<T> & Bx,
+      py::array_t<I> & Cp,
+      py::array_t<I> & Cj,
+      py::array_t<T> & Cx
+                         )
+{
+    auto py_Ap = Ap.unchecked();
+    auto py_Aj = Aj.unchecked();
+    auto py_Ax = Ax.unchecked();
+    auto py_Bp = Bp.unchecked();
+    auto py_Bj = Bj.unchecked();
+    auto py_Bx = Bx.unchecked();
+    auto py_Cp = Cp.unchecked();
+    auto py_Cj = Cj.unchecked();
+    auto py_Cx = Cx.mutable_unchecked();
+    const I *_Ap = py_Ap.data();
+    const I *_Aj = py_Aj.data();
+    const T *_Ax = py_Ax.data();
+    const I *_Bp = py_Bp.data();
+    const I *_Bj = py_Bj.data();
+    const T *_Bx = py_Bx.data();
+    const I *_Cp = py_Cp.data();
+    const I *_Cj = py_Cj.data();
+    T *_Cx = py_Cx.mutable_data();
+
+    return csr_matmat_numeric <I, T>(
+                    n_row,
+                    n_col,
+                      _Ap, Ap.shape(0),
+                      _Aj, Aj.shape(0),
+                      _Ax, Ax.shape(0),
+                      _Bp, Bp.shape(0),
+                      _Bj, Bj.shape(0),
+                      _Bx, Bx.shape(0),
+                      _Cp, Cp.shape(0),
+                      _Cj, Cj.shape(0),
+                      _Cx, Cx.shape(0)
+                                     );
+}
+
 PYBIND11_MODULE(linalg, m) {
     m.doc() = R"pbdoc(
     Pybind11 bindings for linalg.h
@@ -125,6 +240,9 @@ PYBIND11_MODULE(linalg, m) {
     pinv_array
     csc_scale_columns
     csc_scale_rows
+    csr_residual
+    csr_residual_norm
+    csr_matmat_numeric
     )pbdoc";
 
     py::options options;
@@ -210,5 +328,68 @@ Scale the rows of a CSC matrix *in place*
 See:
 https://github.com/scipy/scipy/blob/master/scipy/sparse/sparsetools/csr.h)pbdoc");
 
+    m.def("csr_residual", &_csr_residual<int, float>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert(), py::arg("Rx").noconvert());
+    m.def("csr_residual", &_csr_residual<int, double>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert(), py::arg("Rx").noconvert());
+    m.def("csr_residual", &_csr_residual<int, std::complex<float>>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert(), py::arg("Rx").noconvert());
+    m.def("csr_residual", &_csr_residual<int, std::complex<double>>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert(), py::arg("Rx").noconvert(),
+R"pbdoc(
+Compute the residual of a CSR matrix in a single pass
+
+  R = B - A*X
+
+Fusing the matvec and the subtraction avoids the temporary A*X and a
+second pass over the vectors.)pbdoc");
+
+    m.def("csr_residual_norm", &_csr_residual_norm<int, float, float>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert());
+    m.def("csr_residual_norm", &_csr_residual_norm<int, double, double>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert());
+    m.def("csr_residual_norm", &_csr_residual_norm<int, std::complex<float>, float>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert());
+    m.def("csr_residual_norm", &_csr_residual_norm<int, std::complex<double>, double>,
+        py::arg("n_row"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Xx").noconvert(), py::arg("Bx").noconvert(),
+R"pbdoc(
+Compute the 2-norm of the residual of a CSR matrix in a single pass
+
+  ||B - A*X||
+
+Each residual entry is formed, squared and accumulated in place, so
+unlike csr_residual nothing is written back.  This is all the solve loop
+needs for its convergence test.)pbdoc");
+
+    m.def("csr_matmat_numeric", &_csr_matmat_numeric<int, float>,
+        py::arg("n_row"), py::arg("n_col"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Bp").noconvert(), py::arg("Bj").noconvert(), py::arg("Bx").noconvert(), py::arg("Cp").noconvert(), py::arg("Cj").noconvert(), py::arg("Cx").noconvert());
+    m.def("csr_matmat_numeric", &_csr_matmat_numeric<int, double>,
+        py::arg("n_row"), py::arg("n_col"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Bp").noconvert(), py::arg("Bj").noconvert(), py::arg("Bx").noconvert(), py::arg("Cp").noconvert(), py::arg("Cj").noconvert(), py::arg("Cx").noconvert());
+    m.def("csr_matmat_numeric", &_csr_matmat_numeric<int, std::complex<float>>,
+        py::arg("n_row"), py::arg("n_col"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Bp").noconvert(), py::arg("Bj").noconvert(), py::arg("Bx").noconvert(), py::arg("Cp").noconvert(), py::arg("Cj").noconvert(), py::arg("Cx").noconvert());
+    m.def("csr_matmat_numeric", &_csr_matmat_numeric<int, std::complex<double>>,
+        py::arg("n_row"), py::arg("n_col"), py::arg("Ap").noconvert(), py::arg("Aj").noconvert(), py::arg("Ax").noconvert(), py::arg("Bp").noconvert(), py::arg("Bj").noconvert(), py::arg("Bx").noconvert(), py::arg("Cp").noconvert(), py::arg("Cj").noconvert(), py::arg("Cx").noconvert(),
+R"pbdoc(
+Numeric phase of the sparse matrix product C = A*B for CSR matrices
+
+The structure of C, given by Cp and Cj, must contain that of A*B, for
+instance from an earlier product of matrices with the same structure.
+Only the values Cx are computed, so when A and B change values but not
+structure, as for the Galerkin products R*A*P of a hierarchy, the
+symbolic phase is not repeated.
+
+Parameters
+----------
+n_row, n_col : int
+     Dimensions of C
+Ap, Aj, Ax : array
+     CSR representation of A
+Bp, Bj, Bx : array
+     CSR representation of B
+Cp, Cj : array
+     Row pointer and column index arrays of C
+Cx : array
+     Values of C, overwritten)pbdoc");
+
 }
 
@@ -9,11 +9,12 @@ from scipy import sparse
 from . import amg_core
 
 __all__ = ['maximal_independent_set', 'vertex_coloring', 'bellman_ford',
-           'lloyd_cluster', 'connected_components']
+           'bellman_ford_multi', 'lloyd_cluster', 'connected_components']
 
-from pyamg.graph_ref import bellman_ford_reference
+from pyamg.graph_ref import (bellman_ford_reference,
+                             bellman_ford_multi_reference)
 
-__all__ += ['bellman_ford_reference']
+__all__ += ['bellman_ford_reference', 'bellman_ford_multi_reference']
 
 
 def asgraph(G):
@@ -159,6 +160,44 @@ def bellman_ford(G, seeds):
     return (distances, nearest_seed)
 
 
+def bellman_ford_multi(G, sources):
+    """Bellman-Ford iteration from several sources at once.
+
+    Parameters
+    ----------
+    G : sparse matrix
+        Directed graph with positive weights.
+    sources : list
+        Starting nodes, one traversal per source
+
+    Returns
+    -------
+    distances : array
+        N x k array where distances[:, k] is the distance of each point
+        to sources[k]
+    """
+    G = asgraph(G)
+    N = G.shape[0]
+
+    if G.nnz > 0:
+        if G.data.min() < 0:
+            raise ValueError('Bellman-Ford is defined only for '
+                             'positive weights.')
+    if G.dtype == complex:
+        raise ValueError('Bellman-Ford is defined only for real weights.')
+
+    sources = np.asarray(sources, dtype='intc')
+    k = len(sources)
+
+    distances = np.full((N, k), np.inf, dtype=G.dtype)
+    distances[sources, np.arange(k)] = 0
+
+    amg_core.bellman_ford_multi(N, k, G.indptr, G.indices, G.data,
+                                distances.ravel())
+
+    return distances
+
+
 def lloyd_cluster(G, seeds, maxiter=10):
     """Perform Lloyd clustering on graph with weighted edges.
 
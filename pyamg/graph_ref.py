@@ -3,12 +3,38 @@ import numpy as np
 import scipy.sparse as sparse
 
 
+def _edge_list(A):
+    """Positive-weight edges of A, sorted by source, with a row pointer."""
+    A = sparse.coo_matrix(A)
+    mask = A.data > 0  # only positive weights are relaxed
+    src, dst, w = A.row[mask], A.col[mask], A.data[mask]
+
+    # struct-of-arrays edge list sorted by source, then by destination, so
+    # the out-edges of a node are contiguous; duplicate edges are kept as
+    # separate edges (a CSR conversion would sum their weights)
+    order = np.lexsort((dst, src))
+    src, dst, w = src[order], dst[order], w[order]
+
+    indptr = np.zeros((A.shape[0] + 1,), dtype=int)
+    np.cumsum(np.bincount(src, minlength=A.shape[0]), out=indptr[1:])
+
+    return src, dst, w, indptr
+
+
+def _out_edges(indptr, frontier):
+    """Edge indices of all out-edges of the nodes in frontier."""
+    counts = indptr[frontier + 1] - indptr[frontier]
+    offset = np.cumsum(counts) - counts
+    return np.repeat(indptr[frontier] - offset, counts) +\
+        np.arange(counts.sum())
+
+
 def bellman_ford_reference(A, c):
     """Reference implementation of Bellman-Ford.
 
     Parameters
     ---------
-    A : coo sparse matrix
+    A : sparse matrix
         n x n directed graph with positive weights
 
     c : array_like
@@ -28,21 +54,100 @@ def bellman_ford_reference(A, c):
 
     """
     Nnode = A.shape[0]
-    Ncluster = len(c)
     d = np.full((Nnode,), np.inf)
     m = np.full((Nnode,), -1.0, dtype=np.int)
 
     d[c] = 0  # distance
     m[c] = c  # index
 
-    done = False
-    while not done:
-        done = True
-        for i, j, Aij in zip(A.row, A.col, A.data):
-            if Aij > 0 and d[i] + Aij < d[j]:
-                d[j] = d[i] + Aij
-                m[j] = m[i]
-                done = False
+    src, dst, w, indptr = _edge_list(A)
+
+    # Only the out-edges of nodes whose distance changed in the previous
+    # pass can relax anything, so each pass is a min-plus (tropical
+    # semiring) SpMV restricted to that frontier
+    frontier = np.flatnonzero(d < np.inf)
+    while len(frontier) > 0:
+        e = _out_edges(indptr, frontier)
+        i, j = src[e], dst[e]
+        cand = d[i] + w[e]
+
+        # sort by destination, then by distance: the first edge into each
+        # destination attains the minimum (ties go to the smallest source)
+        order = np.lexsort((cand, j))
+        i, j, cand = i[order], j[order], cand[order]
+        first = np.ones(len(j), dtype=bool)
+        first[1:] = j[1:] != j[:-1]
+        i, j, cand = i[first], j[first], cand[first]
+
+        upd = cand < d[j]
+        i, j = i[upd], j[upd]
+        d[j] = cand[upd]
+        m[j] = m[i]
+
+        frontier = j
+
+    return (d, m)
+
+
+def bellman_ford_multi_reference(A, c):
+    """Reference implementation of Bellman-Ford from several sources at once.
+
+    Equivalent to calling bellman_ford_reference(A, [c[k]]) for each k, but
+    all sources share one traversal: each edge is loaded once per pass and
+    relaxed for every source.
+
+    Parameters
+    ---------
+    A : sparse matrix
+        n x n directed graph with positive weights
+
+    c : array_like
+        list of k sources
+
+    Return
+    ------
+    m : ndarray
+        n x k array, m[:, k] is c[k] where reachable from c[k] and -1 otherwise
+
+    d : ndarray
+        n x k array, d[:, k] is the distance from c[k]
+
+    See Also
+    --------
+    bellman_ford_reference
+
+    """
+    c = np.asarray(c, dtype=int)
+    Nnode = A.shape[0]
+    Nsource = len(c)
+    d = np.full((Nnode, Nsource), np.inf)
+
+    d[c, np.arange(Nsource)] = 0
+
+    src, dst, w, indptr = _edge_list(A)
+
+    # a node is in the frontier if its distance to any source changed
+    frontier = np.unique(c)
+    while len(frontier) > 0:
+        e = _out_edges(indptr, frontier)
+        if len(e) == 0:
+            break
+        e = e[np.argsort(dst[e], kind='stable')]
+        i, j = src[e], dst[e]
+
+        # min-plus product over the edges into each destination, for all
+        # sources at once; d is row-major so the source axis is contiguous
+        cand = d[i] + w[e, np.newaxis]
+        start = np.flatnonzero(np.r_[True, j[1:] != j[:-1]])
+        j = j[start]
+        dmin = np.minimum.reduceat(cand, start, axis=0)
+
+        upd = dmin < d[j]
+        d[j] = np.where(upd, dmin, d[j])
+
+        frontier = j[upd.any(axis=1)]
+
+    m = np.where(d < np.inf, c, -1)
 
     return (d, m)
 
@@ -61,9 +166,9 @@ if __name__  == '__main__':
     c = np.array([0,1,2,3,4])
 
     print('\nreference--')
-    for cc in c:
-        d, m = bellman_ford_reference(A, [cc])
-        print(d, m)
+    D, M = bellman_ford_multi_reference(A, c)
+    for k in range(len(c)):
+        print(D[:, k], M[:, k])
 
     print('\npyamg--')
     from pyamg.graph import bellman_ford
@@ -6,9 +6,19 @@ from warnings import warn
 import scipy as sp
 import numpy as np
 
+try:
+    from scipy.sparse._sparsetools import csr_matvec, bsr_matvec
+except ImportError:
+    from scipy.sparse.sparsetools import csr_matvec, bsr_matvec
+
+from . import amg_core
+
 
 __all__ = ['multilevel_solver', 'coarse_grid_solver']
 
+# steps of a flattened multigrid cycle, see multilevel_solver.__schedule
+_DOWN, _COARSE, _UP = range(3)
+
 
 class multilevel_solver:
     """Stores multigrid hierarchy and implements the multigrid cycle.
@@ -33,12 +43,16 @@ class multilevel_solver:
         Create a preconditioner using this multigrid cycle
     cycle_complexity()
         A measure of the cost of a single multigrid cycle.
+    from_hierarchy()
+        Construct a solver from a fine matrix and interpolation operators.
     grid_complexity()
         A measure of the rate of coarsening.
     operator_complexity()
         A measure of the size of the multigrid hierarchy.
     solve()
         Iteratively solves a linear system for the right hand side.
+    update_values()
+        Recompute the coarse operators for a new fine matrix.
 
     """
 
@@ -70,7 +84,7 @@ class multilevel_solver:
             """Level construct (empty)."""
             pass
 
-    def __init__(self, levels, coarse_solver='pinv2'):
+    def __init__(self, levels, coarse_solver='splu'):
         """Class constructor responsible for initializing the cycle and ensuring the list of levels is complete.
 
         Parameters
@@ -89,7 +103,7 @@ class multilevel_solver:
 
             Sparse direct methods:
 
-            * splu         : sparse LU solver
+            * splu         : sparse LU solver (default)
 
             Sparse iterative methods:
 
@@ -98,15 +112,16 @@ class multilevel_solver:
 
             Dense methods:
 
-            * pinv     : pseudoinverse (QR)
-            * pinv2    : pseudoinverse (SVD)
+            * pinv     : pseudoinverse (SVD, relative cutoff)
+            * pinv2    : pseudoinverse (SVD, absolute cutoff)
             * lu       : LU factorization
             * cholesky : Cholesky factorization
 
         Notes
         -----
         If not defined, the R attribute on each level is set to
-        the transpose of P.
+        the conjugate transpose of P, stored in the same sparse format as P.
+        This costs the memory of one extra copy of P per level.
 
         Examples
         --------
@@ -153,7 +168,143 @@ class multilevel_solver:
 
         for level in levels[:-1]:
             if not hasattr(level, 'R'):
-                level.R = level.P.H
+                # P.H of a CSR matrix is a CSC view; store R explicitly in the
+                # format of P so restriction is a row-wise SpMV every cycle
+                level.R = level.P.H.asformat(level.P.format)
+
+        self.__init_operators()
+
+        # structure of the Galerkin products, see update_values
+        self._galerkin = [None] * (len(levels) - 1)
+
+        # flattened V, W and F cycles, built on first use
+        self._schedules = {}
+
+        self.__init_work(levels[0].A.dtype)
+
+    def __init_operators(self):
+        """Cache the level sizes and the operators used by the cycle."""
+        levels = self.levels
+
+        # the level sizes are fixed once the hierarchy is built
+        self._nnz = [level.A.nnz for level in levels]
+        self._unknowns = [level.A.shape[0] for level in levels]
+
+        # operators used for the residual in the cycle
+        self._residual_A = [_csr_view(level.A) for level in levels[:-1]]
+
+    @classmethod
+    def from_hierarchy(cls, A, P_list, R_list=None,
+                       presmoother=('gauss_seidel', {'sweep': 'symmetric'}),
+                       postsmoother=('gauss_seidel', {'sweep': 'symmetric'}),
+                       **kwargs):
+        """Construct a multilevel solver from its interpolation operators.
+
+        Each coarse operator is formed as the Galerkin product R*A*P.  For
+        CSR operators the structure of the products is kept, so that a later
+        call to update_values only repeats their numeric phase.
+
+        Parameters
+        ----------
+        A : csr_matrix, bsr_matrix
+            Fine-level matrix
+        P_list : list
+            Prolongation operators, finest first
+        R_list : list
+            Restriction operators.  By default the conjugate transpose of
+            each P, in the format of P.
+        presmoother, postsmoother : string, tuple, list
+            Smoothers, as for change_smoothers
+        kwargs : dict
+            Further arguments for multilevel_solver, e.g. coarse_solver
+
+        Returns
+        -------
+        ml : multilevel_solver
+
+        Examples
+        --------
+        >>> from pyamg.gallery import poisson
+        >>> from pyamg.multilevel import multilevel_solver
+        >>> from pyamg import smoothed_aggregation_solver
+        >>> A = poisson((100, 100), format='csr')
+        >>> ml = smoothed_aggregation_solver(A)
+        >>> P_list = [level.P for level in ml.levels[:-1]]
+        >>> ml = multilevel_solver.from_hierarchy(A, P_list)
+        >>> ml.update_values(2 * A)
+
+        """
+        from pyamg.relaxation.smoothing import change_smoothers
+
+        if R_list is None:
+            R_list = [P.H.asformat(P.format) for P in P_list]
+
+        levels = []
+        galerkin = []
+        for P, R in zip(P_list, R_list):
+            levels.append(cls.level())
+            levels[-1].A = A
+            levels[-1].P = P
+            levels[-1].R = R
+            A, structure = _galerkin_product(R, A, P)
+            galerkin.append(structure)
+        levels.append(cls.level())
+        levels[-1].A = A
+
+        ml = cls(levels, **kwargs)
+        ml._galerkin = galerkin
+        change_smoothers(ml, presmoother, postsmoother)
+        return ml
+
+    def update_values(self, A):
+        """Recompute the hierarchy for a new fine-level matrix.
+
+        The interpolation operators are kept and each coarse operator is
+        formed again as the Galerkin product R*A*P.  For CSR operators the
+        structure of the products is computed once, by the first call or by
+        from_hierarchy, and reused while A keeps the same structure, so only
+        their numeric phase is repeated.  Smoothers set with change_smoothers
+        are set up again, and the coarse solver refactors on its next solve.
+
+        Parameters
+        ----------
+        A : sparse matrix
+            New fine-level matrix, of the same shape as levels[0].A
+
+        Returns
+        -------
+        Nothing, the hierarchy is updated in place.
+
+        """
+        if A.shape != self.levels[0].A.shape:
+            raise ValueError('A must have shape %s'
+                             % (self.levels[0].A.shape,))
+
+        self.levels[0].A = A
+        for lvl, level in enumerate(self.levels[:-1]):
+            self.levels[lvl + 1].A, self._galerkin[lvl] = \
+                _galerkin_product(level.R, level.A, level.P,
+                                  self._galerkin[lvl])
+
+        self.__init_operators()
+
+        if hasattr(self, '_smoothers'):
+            from pyamg.relaxation.smoothing import change_smoothers
+            change_smoothers(self, *self._smoothers)
+
+    def __init_work(self, dtype):
+        """Preallocate the work vectors used by __solve on each level.
+
+        The residual, the restricted residual and the coarse-grid correction
+        are reused on every cycle, rather than allocated per call.
+        """
+        self._work_dtype = np.dtype(dtype)
+        self._work = []
+        for level in self.levels[:-1]:
+            residual = np.zeros((level.A.shape[0],), dtype=dtype)
+            coarse_b = np.zeros((level.R.shape[0],), dtype=dtype)
+            coarse_x = np.zeros((level.R.shape[0],), dtype=dtype)
+            self._work.append((residual, coarse_b, coarse_x))
 
     def __repr__(self):
         """Print basic statistics about the multigrid hierarchy."""
@@ -163,7 +314,7 @@ class multilevel_solver:
         output += 'Grid Complexity:     %6.3f\n' % self.grid_complexity()
         output += 'Coarse Solver:        %s\n' % self.coarse_solver.name()
 
-        total_nnz = sum([level.A.nnz for level in self.levels])
+        total_nnz = sum(self._nnz)
 
         output += '  level   unknowns     nonzeros\n'
         for n, level in enumerate(self.levels):
@@ -209,7 +360,7 @@ class multilevel_solver:
         """
         cycle = str(cycle).upper()
 
-        nnz = [level.A.nnz for level in self.levels]
+        nnz = self._nnz
 
         def V(level):
             if len(self.levels) == 1:
@@ -254,8 +405,7 @@ class multilevel_solver:
             Number of nonzeros in the matrix on the finest level
 
         """
-        return sum([level.A.nnz for level in self.levels]) /\
-            float(self.levels[0].A.nnz)
+        return sum(self._nnz) / float(self._nnz[0])
 
     def grid_complexity(self):
         """Grid complexity of this multigrid hierarchy.
@@ -265,8 +415,7 @@ class multilevel_solver:
             Number of unknowns on the finest level
 
         """
-        return sum([level.A.shape[0] for level in self.levels]) /\
-            float(self.levels[0].A.shape[0])
+        return sum(self._unknowns) / float(self._unknowns[0])
 
     def psolve(self, b):
         """Lagacy solve interface."""
@@ -316,7 +465,8 @@ class multilevel_solver:
         return LinearOperator(shape, matvec, dtype=dtype)
 
     def solve(self, b, x0=None, tol=1e-5, maxiter=100, cycle='V', accel=None,
-              callback=None, residuals=None, return_residuals=False):
+              callback=None, residuals=None, return_residuals=False,
+              out=None):
         """Execute multigrid cycling.
 
         Parameters
@@ -342,6 +492,11 @@ class multilevel_solver:
             called as callback(xk) where xk is the k-th iterate vector.
         residuals : list
             List to contain residual norms at each iteration.
+        out : array
+            Optional array, of the same shape as b, in which to place the
+            solution.  The iterate is updated in place, which avoids copying
+            x0 on every call; out may be x0 itself.  Without acceleration it
+            must be contiguous and of the upcast type of A, x0 and b.
 
         Returns
         -------
@@ -365,8 +520,24 @@ class multilevel_solver:
 
         """
         from pyamg.util.linalg import residual_norm, norm
+        from scipy.sparse.sputils import upcast
+        from pyamg.util.utils import to_type
 
-        if x0 is None:
+        if out is not None and accel is None:
+            # check out before it is overwritten
+            dtypes = [b.dtype, out.dtype, self.levels[0].A.dtype]
+            if x0 is not None:
+                dtypes.append(np.asarray(x0).dtype)
+            tp = upcast(*dtypes)
+            if out.dtype != tp or not out.flags.c_contiguous:
+                raise ValueError('out must be a contiguous array of type %s'
+                                 % tp)
+            x = out
+            if x0 is None:
+                x.fill(0)
+            elif x0 is not out:
+                x[...] = x0
+        elif x0 is None:
             x = np.zeros_like(b)
         else:
             x = np.array(x0)  # copy
@@ -414,8 +585,8 @@ class multilevel_solver:
             M = self.aspreconditioner(cycle=cycle)
 
             try:  # try PyAMG style interface which has a residuals parameter
-                return accel(A, b, x0=x0, tol=tol, maxiter=maxiter, M=M,
-                             callback=callback, residuals=residuals, **kwargs)[0]
+                x = accel(A, b, x0=x0, tol=tol, maxiter=maxiter, M=M,
+                          callback=callback, residuals=residuals, **kwargs)[0]
             except BaseException:
                 # try the scipy.sparse.linalg.isolve style interface,
                 # which requires a call back function if a residual
@@ -433,8 +604,13 @@ class multilevel_solver:
                         if cb is not None:
                             cb(x)
 
-                return accel(A, b, x0=x0, tol=tol, maxiter=maxiter, M=M,
-                             callback=callback, **kwargs)[0]
+                x = accel(A, b, x0=x0, tol=tol, maxiter=maxiter, M=M,
+                          callback=callback, **kwargs)[0]
+
+            if out is not None:
+                out[...] = x.reshape(out.shape)
+                return out
+            return x
 
         else:
             # Scale tol by normb
@@ -453,25 +629,31 @@ class multilevel_solver:
 
         # Create uniform types for A, x and b
         # Clearly, this logic doesn't handle the case of real A and complex b
-        from scipy.sparse.sputils import upcast
-        from pyamg.util.utils import to_type
         tp = upcast(b.dtype, x.dtype, self.levels[0].A.dtype)
         [b, x] = to_type(tp, [b, x])
         b = np.ravel(b)
         x = np.ravel(x)
 
+        if tp != self._work_dtype:
+            self.__init_work(tp)
+
         A = self.levels[0].A
 
         residuals.append(residual_norm(A, x, b))
 
+        if len(self.levels) > 1 and cycle != 'AMLI':
+            schedule = self.__schedule(cycle)
+
         self.first_pass = True
 
         while len(residuals) <= maxiter and residuals[-1] > tol:
             if len(self.levels) == 1:
                 # hierarchy has only 1 level
-                x = self.coarse_solver(A, b)
+                x[:] = self.coarse_solver(A, b)
+            elif cycle == 'AMLI':
+                self.__solve(0, x, b)
             else:
-                self.__solve(0, x, b, cycle)
+                self.__cycle(x, b, schedule)
 
             residuals.append(residual_norm(A, x, b))
 
@@ -485,8 +667,79 @@ class multilevel_solver:
         else:
             return x
 
-    def __solve(self, lvl, x, b, cycle):
-        """Multigrid cycling.
+    def __schedule(self, cycle):
+        """Flatten the recursion of a V, W or F cycle into a list of steps.
+
+        Each step is a pair (step, lvl): _DOWN smooths on level lvl and
+        restricts the residual, _UP interpolates the correction from level
+        lvl + 1 and smooths, and _COARSE is the coarse grid solve.  The list
+        depends only on the cycle and the number of levels, so it is built
+        once per cycle type and a cycle then runs as a single loop.
+        """
+        if cycle not in self._schedules:
+            schedule = []
+            coarsest = len(self.levels) - 2
+
+            def visit(lvl, cycle):
+                schedule.append((_DOWN, lvl))
+                if lvl == coarsest:
+                    schedule.append((_COARSE, lvl))
+                elif cycle == 'V':
+                    visit(lvl + 1, 'V')
+                elif cycle == 'W':
+                    visit(lvl + 1, 'W')
+                    visit(lvl + 1, 'W')
+                elif cycle == 'F':
+                    visit(lvl + 1, 'F')
+                    visit(lvl + 1, 'V')
+                else:
+                    raise TypeError('Unrecognized cycle type (%s)' % cycle)
+                schedule.append((_UP, lvl))
+
+            visit(0, cycle)
+            self._schedules[cycle] = schedule
+
+        return self._schedules[cycle]
+
+    def __cycle(self, x, b, schedule):
+        """Run one multigrid cycle given as a schedule from __schedule.
+
+        Parameters
+        ----------
+        x : numpy array
+            Initial guess `x` and return correction
+        b : numpy array
+            Right-hand side for Ax=b
+        schedule : list
+            Steps of the cycle
+
+        """
+        levels = self.levels
+        work = self._work
+        xs = [x] + [coarse_x for _, _, coarse_x in work]
+        bs = [b] + [coarse_b for _, coarse_b, _ in work]
+
+        for step, lvl in schedule:
+            level = levels[lvl]
+            if step == _DOWN:
+                residual, coarse_b, coarse_x = work[lvl]
+                level.presmoother(level.A, xs[lvl], bs[lvl])
+                _residual(self._residual_A[lvl], xs[lvl], bs[lvl], residual)
+                coarse_b.fill(0)
+                _matvec_add(level.R, residual, coarse_b)
+                coarse_x.fill(0)
+            elif step == _UP:
+                # coarse grid correction
+                _matvec_add(level.P, xs[lvl + 1], xs[lvl])
+                level.postsmoother(level.A, xs[lvl], bs[lvl])
+            else:
+                xs[-1][:] = self.coarse_solver(levels[-1].A, bs[-1])
+
+    def __solve(self, lvl, x, b):
+        """AMLI cycling.
+
+        The coarse grid corrections of an AMLI cycle depend on the iterates,
+        so unlike V, W and F cycles it is run recursively.
 
         Parameters
         ----------
@@ -496,85 +749,108 @@ class multilevel_solver:
             Initial guess `x` and return correction
         b : numpy array
             Right-hand side for Ax=b
-        cycle : {'V','W','F','AMLI'}
-            Recursively called cycling function.  The
-            Defines the cycling used:
-            cycle = 'V',    V-cycle
-            cycle = 'W',    W-cycle
-            cycle = 'F',    F-cycle
-            cycle = 'AMLI', AMLI-cycle
 
         """
         A = self.levels[lvl].A
+        residual, coarse_b, coarse_x = self._work[lvl]
 
         self.levels[lvl].presmoother(A, x, b)
 
-        residual = b - A * x
+        _residual(self._residual_A[lvl], x, b, residual)
 
-        coarse_b = self.levels[lvl].R * residual
-        coarse_x = np.zeros_like(coarse_b)
+        coarse_b.fill(0)
+        _matvec_add(self.levels[lvl].R, residual, coarse_b)
+        coarse_x.fill(0)
 
         if lvl == len(self.levels) - 2:
             coarse_x[:] = self.coarse_solver(self.levels[-1].A, coarse_b)
         else:
-            if cycle == 'V':
-                self.__solve(lvl + 1, coarse_x, coarse_b, 'V')
-            elif cycle == 'W':
-                self.__solve(lvl + 1, coarse_x, coarse_b, cycle)
-                self.__solve(lvl + 1, coarse_x, coarse_b, cycle)
-            elif cycle == 'F':
-                self.__solve(lvl + 1, coarse_x, coarse_b, cycle)
-                self.__solve(lvl + 1, coarse_x, coarse_b, 'V')
-            elif cycle == "AMLI":
-                # Run nAMLI AMLI cycles, which compute "optimal" corrections by
-                # orthogonalizing the coarse-grid corrections in the A-norm
-                nAMLI = 2
-                Ac = self.levels[lvl + 1].A
-                p = np.zeros((nAMLI, coarse_b.shape[0]), dtype=coarse_b.dtype)
-                beta = np.zeros((nAMLI, nAMLI), dtype=coarse_b.dtype)
-                for k in range(nAMLI):
-                    # New search direction --> M^{-1}*residual
-                    p[k, :] = 1
-                    self.__solve(lvl + 1, p[k, :].reshape(coarse_b.shape),
-                                 coarse_b, cycle)
-
-                    # Orthogonalize new search direction to old directions
-                    for j in range(k):  # loops from j = 0...(k-1)
-                        beta[k, j] = np.inner(p[j, :].conj(), Ac * p[k, :]) /\
-                            np.inner(p[j, :].conj(), Ac * p[j, :])
-                        p[k, :] -= beta[k, j] * p[j, :]
-
-                    # Compute step size
-                    Ap = Ac * p[k, :]
-                    alpha = np.inner(p[k, :].conj(), np.ravel(coarse_b)) /\
-                        np.inner(p[k, :].conj(), Ap)
-
-                    # Update solution
-                    coarse_x += alpha * p[k, :].reshape(coarse_x.shape)
-
-                    # Update residual
-                    coarse_b -= alpha * Ap.reshape(coarse_b.shape)
-            else:
-                raise TypeError('Unrecognized cycle type (%s)' % cycle)
-
-        x += self.levels[lvl].P * coarse_x   # coarse grid correction
+            # Run nAMLI AMLI cycles, which compute "optimal" corrections by
+            # orthogonalizing the coarse-grid corrections in the A-norm
+            nAMLI = 2
+            Ac = self.levels[lvl + 1].A
+            p = np.zeros((nAMLI, coarse_b.shape[0]), dtype=coarse_b.dtype)
+            beta = np.zeros((nAMLI, nAMLI), dtype=coarse_b.dtype)
+            for k in range(nAMLI):
+                # New search direction --> M^{-1}*residual
+                p[k, :] = 1
+                self.__solve(lvl + 1, p[k, :].reshape(coarse_b.shape),
+                             coarse_b)
+
+                # Orthogonalize new search direction to old directions
+                for j in range(k):  # loops from j = 0...(k-1)
+                    beta[k, j] = np.inner(p[j, :].conj(), Ac * p[k, :]) /\
+                        np.inner(p[j, :].conj(), Ac * p[j, :])
+                    p[k, :] -= beta[k, j] * p[j, :]
+
+                # Compute step size
+                Ap = Ac * p[k, :]
+                alpha = np.inner(p[k, :].conj(), np.ravel(coarse_b)) /\
+                    np.inner(p[k, :].conj(), Ap)
+
+                # Update solution
+                coarse_x += alpha * p[k, :].reshape(coarse_x.shape)
+
+                # Update residual
+                coarse_b -= alpha * Ap.reshape(coarse_b.shape)
+
+        _matvec_add(self.levels[lvl].P, coarse_x, x)  # coarse grid correction
 
         self.levels[lvl].postsmoother(A, x, b)
 
 
+def _matvec_add(A, x, y):
+    """Accumulate y += A*x in place, without a temporary for CSR or BSR A."""
+    if np.result_type(A.dtype, x.dtype) != y.dtype:
+        y += A * x
+    elif sp.sparse.isspmatrix_csr(A):
+        csr_matvec(A.shape[0], A.shape[1], A.indptr, A.indices, A.data, x, y)
+    elif sp.sparse.isspmatrix_bsr(A):
+        R, C = A.blocksize
+        bsr_matvec(A.shape[0] // R, A.shape[1] // C, R, C,
+                   A.indptr, A.indices, np.ravel(A.data), x, y)
+    else:
+        y += A * x
+
+
+def _csr_view(A):
+    """View a BSR matrix A with 1x1 blocks as CSR, sharing its arrays.
+
+    Smoothed aggregation stores the coarse levels of scalar problems this
+    way, and the view lets them use the fused CSR residual.
+    """
+    if sp.sparse.isspmatrix_bsr(A) and A.blocksize == (1, 1):
+        return sp.sparse.csr_matrix((A.data.reshape(-1), A.indices, A.indptr),
+                                    shape=A.shape)
+    return A
+
+
+def _residual(A, x, b, r):
+    """Compute r = b - A*x in place, in a single pass over A when A is CSR."""
+    if sp.sparse.isspmatrix_csr(A) and A.indices.dtype == np.intc and\
+            A.dtype == x.dtype == b.dtype == r.dtype and\
+            A.dtype.char in 'fdFD':
+        amg_core.csr_residual(A.shape[0], A.indptr, A.indices, A.data,
+                              x, b, r)
+    else:
+        np.subtract(b, A * x, out=r)
+
+
 def coarse_grid_solver(solver):
     """Return a coarse grid solver suitable for multilevel_solver.
 
     Parameters
     ----------
-    solver : string, callable, tuple
+    solver : string, callable, tuple, generic_solver
         The solver method is either (1) a string such as 'splu' or 'pinv' of a
         callable object which receives only parameters (A, b) and returns an
         (approximate or exact) solution to the linear system Ax = b, or (2) a
         callable object that takes parameters (A,b) and returns an (approximate
         or exact) solution to Ax = b, or (3) a tuple of the form
         (string|callable, args), where args is a dictionary of arguments to
-        be passed to the function denoted by string or callable.
+        be passed to the function denoted by string or callable, or (4) a
+        solver previously returned by coarse_grid_solver, which is returned
+        as is so that its factorization is reused.
 
         The set of valid string arguments is:
             - Sparse direct methods:
@@ -583,11 +859,14 @@ def coarse_grid_solver(solver):
                 + the name of any method in scipy.sparse.linalg.isolve or
                   pyamg.krylov (e.g. 'cg').
                   Methods in pyamg.krylov take precedence.
+                  Arguments such as tol and maxiter are passed through,
+                  and M may be 'jacobi' or 'ilu' for a preconditioner that
+                  is built once and reused, e.g. ('cg', {'M': 'jacobi'}).
                 + relaxation method, such as 'gauss_seidel' or 'jacobi',
                   present in pyamg.relaxation
             - Dense methods:
-                + pinv     : pseudoinverse (QR)
-                + pinv2    : pseudoinverse (SVD)
+                + pinv     : pseudoinverse (SVD, relative cutoff)
+                + pinv2    : pseudoinverse (SVD, absolute cutoff)
                 + lu       : LU factorization
                 + cholesky : Cholesky factorization
 
@@ -608,6 +887,9 @@ def coarse_grid_solver(solver):
     >>> x = cgs(A, b)
 
     """
+    if isinstance(solver, generic_solver):
+        return solver
+
     def unpack_arg(v):
         if isinstance(v, tuple):
             return v[0], v[1]
@@ -619,8 +901,37 @@ def coarse_grid_solver(solver):
     if solver in ['pinv', 'pinv2']:
         def solve(self, A, b):
             if not hasattr(self, 'P'):
-                self.P = getattr(sp.linalg, solver)(A.toarray(), **kwargs)
-            return np.dot(self.P, b)
+                # pseudoinverse from a thin SVD, A^+ = V diag(1/s) U^H, with
+                # the singular value cutoff of scipy.linalg.pinv or pinv2
+                U, s, Vh = sp.linalg.svd(A.toarray(), full_matrices=False,
+                                         lapack_driver='gesdd')
+                eps = np.finfo(U.dtype.char.lower()).eps
+                smax = s.max() if len(s) else 0
+                cond = kwargs.get('rcond', kwargs.get('cond'))
+                if solver == 'pinv2':
+                    # absolute cutoff
+                    if cond in [None, -1]:
+                        cond = smax * max(A.shape) * eps
+                    rank = np.sum(s > cond)
+                else:
+                    # cutoff relative to the largest singular value
+                    if cond in [None, -1]:
+                        cond = eps
+                    rank = np.sum(s > cond * smax)
+
+                V = Vh[:rank].conj().T / s[:rank]
+                Uh = U[:, :rank].conj().T
+                if 2 * rank < min(A.shape):
+                    # numerically low rank: the factors take less memory
+                    # and less work per solve than the dense pseudoinverse
+                    self.P = (V, Uh)
+                else:
+                    self.P = (np.dot(V, Uh),)
+
+            x = np.ravel(b)
+            for M in reversed(self.P):
+                x = np.dot(M, x)
+            return x
 
     elif solver == 'lu':
         def solve(self, A, b):
@@ -637,18 +948,25 @@ def coarse_grid_solver(solver):
     elif solver == 'splu':
         def solve(self, A, b):
             if not hasattr(self, 'LU'):
+                # no copy if A is already CSC; A itself is not modified
+                Acsc = A.tocsc()
+
                 # for multiple candidates in B, A will often have a couple zero
                 # rows/columns that must be removed
-                Acsc = A.tocsc()
-                Acsc.eliminate_zeros()
-                diffptr = Acsc.indptr[:-1] - Acsc.indptr[1:]
-                nonzero_cols = (diffptr != 0).nonzero()[0]
-                Map = sp.sparse.eye(Acsc.shape[0], Acsc.shape[1], format='csc')
-                Map = Map[:, nonzero_cols]
-                Acsc = Map.T.tocsc() * Acsc * Map
+                col = np.repeat(np.arange(Acsc.shape[1]), np.diff(Acsc.indptr))
+                nonzero_cols = np.unique(col[Acsc.data != 0])
+                if len(nonzero_cols) < Acsc.shape[1]:
+                    Map = sp.sparse.eye(Acsc.shape[0], Acsc.shape[1],
+                                        format='csc')
+                    Map = Map[:, nonzero_cols]
+                    Acsc = Map.T.tocsc() * Acsc * Map
+                else:
+                    Map = None
                 self.LU = sp.sparse.linalg.splu(Acsc, **kwargs)
                 self.LU_Map = Map
 
+            if self.LU_Map is None:
+                return self.LU.solve(np.ravel(b))
             return self.LU_Map * self.LU.solve(np.ravel(self.LU_Map.T * b))
 
     elif solver in ['bicg', 'bicgstab', 'cg', 'cgs', 'gmres', 'qmr', 'minres']:
@@ -658,7 +976,16 @@ def coarse_grid_solver(solver):
         else:
             fn = getattr(sp.sparse.linalg.isolve, solver)
 
+        # a 'jacobi' or 'ilu' preconditioner is built once, on the first
+        # solve, and cached with the solver; copy the options so that M is
+        # not removed from the caller's dictionary
+        kwargs = dict(kwargs)
+        precond = kwargs.pop('M', None)
+
         def solve(self, A, b):
+            if not hasattr(self, 'M'):
+                self.M = _krylov_preconditioner(A, precond)
+
             if 'tol' not in kwargs:
                 eps = np.finfo(np.float).eps
                 feps = np.finfo(np.single).eps
@@ -668,7 +995,7 @@ def coarse_grid_solver(solver):
                 kwargs['tol'] = {0: feps * 1e3, 1: eps * 1e6,
                                  2: geps * 1e6}[_array_precision[A.dtype.char]]
 
-            return fn(A, b, **kwargs)[0]
+            return fn(A, b, M=self.M, **kwargs)[0]
 
     elif solver in ['gauss_seidel', 'jacobi', 'block_gauss_seidel', 'schwarz',
                     'block_jacobi', 'richardson', 'sor', 'chebyshev',
@@ -702,32 +1029,215 @@ def coarse_grid_solver(solver):
     else:
         raise ValueError('unknown solver: %s' % solver)
 
-    class generic_solver:
-        def __call__(self, A, b):
-            # make sure x is same dimensions and type as b
-            b = np.asanyarray(b)
+    return generic_solver(solver, solve)
 
-            if A.nnz == 0:
-                # if A.nnz = 0, then we expect no correction
-                x = np.zeros(b.shape)
-            else:
-                x = solve(self, A, b)
-
-            if isinstance(b, np.ndarray):
-                x = np.asarray(x)
-            elif isinstance(b, np.matrix):
-                # convert to ndarray
-                b = np.asarray(b)
-                x = np.asarray(x)
-            else:
-                raise ValueError('unrecognized type')
 
-            return x.reshape(b.shape)
+class generic_solver(object):
+    """Coarse grid solver returned by coarse_grid_solver.
+
+    Factorizations are computed on the first solve and reused for as long as
+    the solver is called with the same matrix, or one with identical
+    structure and entries; any other matrix triggers a new factorization.
+    A solver may therefore be passed to a new multilevel_solver whose
+    coarsest operator is unchanged without refactoring.
+    """
+
+    def __init__(self, solver, solve):
+        self.solver = solver
+        self._solve = solve
+        self.A = None
+        self.reset()
+
+    def __call__(self, A, b):
+        # make sure x is same dimensions and type as b
+        b = np.asanyarray(b)
+
+        if A.nnz == 0:
+            # if A.nnz = 0, then we expect no correction
+            x = np.zeros(b.shape)
+        else:
+            if A is not self.A:
+                if self.A is None or not _same_matrix(A, self.A):
+                    self.reset()
+                self.A = A
+            if self._A0 is None:
+                # snapshot of the factored matrix, so that update_factor
+                # sees changes made to A in place
+                self._A0 = A.copy()
+
+            x = self._solve(self, self._A0, b)
+
+            if self._update is not None:
+                # Woodbury correction for the rows changed by update_factor
+                Z, D, C = self._update
+                x = np.ravel(x)
+                x = x - np.dot(Z, sp.linalg.lu_solve(C, D * x))
+
+        if isinstance(b, np.ndarray):
+            x = np.asarray(x)
+        elif isinstance(b, np.matrix):
+            # convert to ndarray
+            b = np.asarray(b)
+            x = np.asarray(x)
+        else:
+            raise ValueError('unrecognized type')
+
+        return x.reshape(b.shape)
 
-        def __repr__(self):
-            return 'coarse_grid_solver(' + repr(solver) + ')'
+    def reset(self):
+        """Discard any cached factorization."""
+        for attr in ['P', 'LU', 'LU_Map', 'L', 'M']:
+            self.__dict__.pop(attr, None)
+        self._A0 = None
+        self._update = None
 
-        def name(self):
-            return repr(solver)
+    def update_factor(self, A):
+        """Update the solver for a modified matrix A.
 
-    return generic_solver()
+        If the cached factorization is an LU or Cholesky factorization and A
+        differs from the factored matrix in a small number of rows k, the
+        factorization is kept and later solves apply the Sherman-Morrison-
+        Woodbury formula, at the cost of k solves now and O(nk) work per
+        solve.  Otherwise the factorization is recomputed at the next solve.
+
+        Parameters
+        ----------
+        A : sparse matrix
+            Modified matrix, of the same shape as the factored one
+
+        """
+        if self.solver not in ['lu', 'cholesky', 'splu'] or \
+                not any(hasattr(self, attr) for attr in ['LU', 'L']) or \
+                A.shape != self._A0.shape:
+            self.reset()
+            self.A = A
+            return
+
+        dA = sp.sparse.csr_matrix(A - self._A0)
+        dA.eliminate_zeros()
+        rows = np.flatnonzero(np.diff(dA.indptr))
+        k = len(rows)
+
+        # no change: the cached factorization is exact
+        if k == 0:
+            self._update = None
+            self.A = A
+            return
+
+        # beyond a tenth of the rows, refactoring is the cheaper option
+        if 10 * k > A.shape[0]:
+            self.reset()
+            self.A = A
+            return
+
+        # with dA = E D, E the columns of the identity for the changed rows,
+        #   (A0 + E D)^{-1} = A0^{-1} - Z (I + D Z)^{-1} D A0^{-1},
+        # where Z = A0^{-1} E
+        D = dA[rows]
+        Z = np.empty((A.shape[0], k), dtype=np.result_type(A.dtype, float))
+        e = np.zeros(A.shape[0])
+        for i, row in enumerate(rows):
+            e[row] = 1
+            Z[:, i] = np.ravel(self._solve(self, self._A0, e))
+            e[row] = 0
+        C = sp.linalg.lu_factor(np.eye(k) + D * Z)
+
+        self._update = (Z, D, C)
+        self.A = A
+
+    def __repr__(self):
+        return 'coarse_grid_solver(' + repr(self.solver) + ')'
+
+    def name(self):
+        return repr(self.solver)
+
+
+def _galerkin_product(R, A, P, structure=None):
+    """Galerkin product R*A*P, reusing a previously computed structure.
+
+    When R, A and P are CSR matrices of the same type, the structure of R*A
+    and R*A*P is computed symbolically on the first call and returned for
+    later calls, which then only run the numeric phase in amg_core.  The
+    structure holds the (indptr, indices) arrays of A, R*A and R*A*P.
+    Otherwise R*A*P is formed directly and the structure is None.
+    """
+    # BSR with 1 x 1 blocks, as from scalar smoothed aggregation, is
+    # multiplied as CSR
+    R, A, P = [M.tocsr() if M.format == 'bsr' and M.blocksize == (1, 1)
+               else M for M in [R, A, P]]
+
+    if not R.format == A.format == P.format == 'csr' or \
+            not R.dtype == A.dtype == P.dtype or \
+            A.dtype.char not in 'fdFD' or \
+            any(M.indices.dtype != np.intc for M in [R, A, P]):
+        return R * A * P, None
+
+    if structure is None or \
+            not np.array_equal(structure[0][0], A.indptr) or \
+            not np.array_equal(structure[0][1], A.indices):
+        # symbolic phase, with entries of one so that no entry of the
+        # product can cancel
+        S_RA = _ones(R) * _ones(A)
+        S_RAP = S_RA * _ones(P)
+        if any(M.indices.dtype != np.intc for M in [S_RA, S_RAP]):
+            return R * A * P, None
+        structure = ((A.indptr.copy(), A.indices.copy()),
+                     (S_RA.indptr, S_RA.indices),
+                     (S_RAP.indptr, S_RAP.indices))
+
+    # R has fewer rows than A, so (R*A)*P takes fewer operations than R*(A*P)
+    RA = _matmat_numeric(R, A, structure[1])
+    return _matmat_numeric(RA, P, structure[2]), structure
+
+
+def _ones(A):
+    """CSR matrix with the structure of A and all stored entries one."""
+    return sp.sparse.csr_matrix((np.ones(A.data.shape), A.indices, A.indptr),
+                                shape=A.shape)
+
+
+def _matmat_numeric(A, B, structure):
+    """CSR product A*B on the (indptr, indices) structure, containing A*B."""
+    indptr, indices = structure
+    shape = (A.shape[0], B.shape[1])
+    data = np.empty(indices.shape, dtype=A.dtype)
+    amg_core.csr_matmat_numeric(shape[0], shape[1],
+                                A.indptr, A.indices, A.data,
+                                B.indptr, B.indices, B.data,
+                                indptr, indices, data)
+    return sp.sparse.csr_matrix((data, indices, indptr), shape=shape)
+
+
+def _krylov_preconditioner(A, M):
+    """Preconditioner for an iterative coarse grid solver.
+
+    M is either 'jacobi' (inverse of the diagonal), 'ilu' (threshold
+    incomplete LU from scipy.sparse.linalg.spilu, which is not symmetric and
+    so is meant for methods such as gmres or bicgstab) or a preconditioner
+    that is returned as is.
+    """
+    if isinstance(M, str):
+        if M == 'jacobi':
+            D = A.diagonal()
+            D[D != 0] = 1.0 / D[D != 0]
+            return sp.sparse.diags(D, format='csr')
+        elif M == 'ilu':
+            ilu = sp.sparse.linalg.spilu(A.tocsc())
+            return sp.sparse.linalg.LinearOperator(A.shape, matvec=ilu.solve,
+                                                   dtype=A.dtype)
+        else:
+            raise ValueError('unknown preconditioner: %s' % M)
+    return M
+
+
+def _same_matrix(A, B):
+    """Test whether sparse matrices A and B have identical entries."""
+    if A.format != B.format or A.shape != B.shape or A.dtype != B.dtype or \
+            A.nnz != B.nnz:
+        return False
+    if A.format in ['csr', 'csc', 'bsr']:
+        return getattr(A, 'blocksize', None) == getattr(B, 'blocksize', None) \
+            and np.array_equal(A.indptr, B.indptr) \
+            and np.array_equal(A.indices, B.indices) \
+            and np.array_equal(A.data, B.data)
+    return (A != B).nnz == 0
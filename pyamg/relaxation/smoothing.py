@@ -134,6 +134,10 @@ def change_smoothers(ml, presmoother, postsmoother):
     """
     ml.symmetric_smoothing = True
 
+    # kept so that multilevel_solver.update_values can set the smoothers up
+    # again for new operators
+    ml._smoothers = (presmoother, postsmoother)
+
     # interpret arguments into list
     if isinstance(presmoother, str) or isinstance(presmoother, tuple) or\
        (presmoother is None):
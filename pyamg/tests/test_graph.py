@@ -3,8 +3,8 @@ import scipy.sparse as sparse
 
 from pyamg.gallery import poisson, load_example
 from pyamg.graph import maximal_independent_set, vertex_coloring,\
-    bellman_ford, lloyd_cluster, connected_components,\
-    bellman_ford_reference
+    bellman_ford, bellman_ford_multi, lloyd_cluster, connected_components,\
+    bellman_ford_reference, bellman_ford_multi_reference
 from pyamg import amg_core
 
 from numpy.testing import TestCase, assert_equal
@@ -140,6 +140,38 @@ class TestGraph(TestCase):
             distance, nearest = bellman_ford(G, [seed])
             assert_equal(distance, distances_FROM_seed[seed])
 
+        # duplicate edges are separate edges, non-positive weights are ignored
+        G = sparse.coo_matrix((np.array([3, 1, 1, 0, -1], dtype=float),
+                               (np.array([0, 0, 1, 1, 2]),
+                                np.array([1, 1, 2, 0, 0]))), shape=(3, 3))
+        distance, nearest = bellman_ford_reference(G, [0])
+        assert_equal(distance, [0, 1, 2])
+        assert_equal(nearest, [0, 0, 0])
+
+    def test_bellman_ford_multi_reference(self):
+        np.random.seed(2716042319)
+
+        for G in self.cases:
+            G.data = np.random.rand(G.nnz)
+            N = G.shape[0]
+
+            sources = np.random.permutation(N)[:min(N, 5)]
+            D, M = bellman_ford_multi_reference(G, sources)
+
+            for k, source in enumerate(sources):
+                d, m = bellman_ford_reference(G, [source])
+                assert_equal(D[:, k], d)
+                assert_equal(M[:, k], m)
+
+            assert_equal(bellman_ford_multi(G, sources), D)
+
+        # more sources than one cache line of distances, so that with
+        # several OpenMP threads they are split over several blocks
+        G = canonical_graph(load_example('airfoil')['A'])
+        G.data = np.random.rand(G.nnz)
+        sources = np.random.permutation(G.shape[0])[:67]
+        D, M = bellman_ford_multi_reference(G, sources)
+        assert_equal(bellman_ford_multi(G, sources), D)
 
     def test_lloyd_cluster(self):
         np.random.seed(3125088753)
@@ -4,7 +4,8 @@ import scipy.sparse as sparse
 from pyamg.gallery import poisson
 from pyamg.multilevel import multilevel_solver, coarse_grid_solver
 
-from numpy.testing import TestCase, assert_almost_equal, assert_equal
+from numpy.testing import TestCase, assert_almost_equal, assert_equal, \
+    assert_array_almost_equal, assert_raises
 
 
 def precon_norm(v, ml):
@@ -30,7 +31,8 @@ class TestMultilevel(TestCase):
         # method should be almost exact for small matrices
         for A in cases:
             for solver in ['splu', 'pinv', 'pinv2', 'lu', 'cholesky',
-                           'cg', fn]:
+                           'cg', ('cg', {'M': 'jacobi'}),
+                           ('gmres', {'M': 'ilu', 'maxiter': 4}), fn]:
                 s = coarse_grid_solver(solver)
 
                 b = np.arange(A.shape[0], dtype=A.dtype)
@@ -42,6 +44,132 @@ class TestMultilevel(TestCase):
                 x = s(A, b)
                 assert_almost_equal(A*x, b)
 
+    def test_coarse_grid_solver_splu(self):
+        # zero rows/columns are removed from the factorization
+        A = sparse.block_diag([poisson((4,)), np.zeros((1, 1))], format='csc')
+        A.data[0] = 0.0  # explicit zero entry in A
+        A_data = A.data.copy()
+        b = np.array([1, 2, 3, 4, 0], dtype=float)
+
+        s = coarse_grid_solver('splu')
+        x = s(A, b)
+        assert_almost_equal(A*x, b)
+        assert_equal(x[4], 0)
+        # A is not modified
+        assert_equal(A.data, A_data)
+
+    def test_coarse_grid_solver_reuse(self):
+        from pyamg import smoothed_aggregation_solver
+
+        A = poisson((30,), format='csr')
+        b = np.arange(A.shape[0], dtype=float)
+
+        for solver in ['splu', 'lu', 'cholesky', 'pinv']:
+            s = coarse_grid_solver(solver)
+            x = s(A, b)
+            factor = [getattr(s, attr) for attr in ['P', 'LU', 'L']
+                      if hasattr(s, attr)][0]
+
+            # an existing solver is returned as is and keeps its factor for
+            # an equal matrix
+            assert(coarse_grid_solver(s) is s)
+            assert_almost_equal(s(A.copy(), b), x)
+            assert([getattr(s, attr) for attr in ['P', 'LU', 'L']
+                    if hasattr(s, attr)][0] is factor)
+
+            # a different matrix is refactored
+            B = A + sparse.eye(A.shape[0], format='csr')
+            assert_almost_equal(B * s(B, b), b)
+
+            # an unchanged matrix keeps the factor with no correction
+            s = coarse_grid_solver(solver)
+            x = s(A, b)
+            s.update_factor(A.copy())
+            assert(s._update is None)
+            assert_almost_equal(s(A, b), x)
+
+            # a low-rank change is applied to the existing factor
+            s = coarse_grid_solver(solver)
+            s(A, b)
+            B = A.tolil()
+            B[2, 2] = 3.0
+            B[2, 5] = -0.5
+            B[5, 2] = -0.5
+            B = B.tocsr()
+            s.update_factor(B)
+            assert_almost_equal(B * s(B, b), b)
+            if solver != 'pinv':
+                assert(s._update is not None)
+
+            # changes made to the matrix in place are seen by update_factor
+            s = coarse_grid_solver(solver)
+            C = A.copy()
+            s(C, b)
+            C.data[C.indptr[2]:C.indptr[3]] *= 2.0
+            s.update_factor(C)
+            assert_almost_equal(C * s(C, b), b)
+
+        # solvers built from the same options each get the preconditioner,
+        # and the options are left intact
+        opts = {'M': 'jacobi'}
+        for i in range(2):
+            s = coarse_grid_solver(('cg', opts))
+            assert_almost_equal(A * s(A, b), b)
+            assert(s.M is not None)
+        assert_equal(opts, {'M': 'jacobi'})
+
+        # transplant the coarse solver into a rebuilt hierarchy
+        A = poisson((20, 20), format='csr')
+        b = np.ones(A.shape[0])
+        ml = smoothed_aggregation_solver(A, max_coarse=50)
+        ml.solve(b, maxiter=1)
+        LU = ml.coarse_solver.LU
+        ml2 = multilevel_solver(ml.levels, coarse_solver=ml.coarse_solver)
+        ml2.solve(b, maxiter=1)
+        assert(ml2.coarse_solver.LU is LU)
+
+    def test_from_hierarchy(self):
+        from pyamg import smoothed_aggregation_solver, ruge_stuben_solver
+        from pyamg.gallery import linear_elasticity
+        np.random.seed(2070254937)
+
+        A = poisson((30, 30), format='csr')
+        E, B = linear_elasticity((15, 15))
+        cases = [(ruge_stuben_solver(A), A),
+                 (smoothed_aggregation_solver(A), A),
+                 (smoothed_aggregation_solver(E, B=B), E)]
+
+        for ml, A in cases:
+            P_list = [level.P for level in ml.levels[:-1]]
+            ml2 = multilevel_solver.from_hierarchy(A, P_list,
+                                                   coarse_solver='splu')
+            assert_equal(len(ml2.levels), len(ml.levels))
+            for level, level2 in zip(ml.levels, ml2.levels):
+                assert_array_almost_equal(level.A.toarray(),
+                                          level2.A.toarray())
+
+            # scalar hierarchies keep the structure of the Galerkin products
+            if A.format == 'csr':
+                assert(all(S is not None for S in ml2._galerkin))
+
+            # new values with the same structure only redo the numerics
+            structure = list(ml2._galerkin)
+            A2 = A.copy()
+            A2.data *= 2.0
+            ml2.update_values(A2)
+            for level, level2 in zip(ml.levels, ml2.levels):
+                assert_array_almost_equal(2.0 * level.A.toarray(),
+                                          level2.A.toarray())
+            for S, S2 in zip(structure, ml2._galerkin):
+                assert(S is S2)
+
+            b = np.random.rand(A.shape[0])
+            residuals = []
+            x = ml2.solve(b, tol=1e-8, residuals=residuals)
+            assert(np.linalg.norm(b - A2*x) < 1e-8 * np.linalg.norm(b))
+
+        assert_raises(ValueError, ml2.update_values, poisson((3, 3)))
+
     def test_aspreconditioner(self):
         from pyamg import smoothed_aggregation_solver
         from scipy.sparse.linalg import cg
@@ -97,6 +225,71 @@ class TestMultilevel(TestCase):
             # print residuals
             assert_almost_equal(np.linalg.norm(b - A*x), residuals[-1])
 
+    def test_solve_single_precision(self):
+        from pyamg import smoothed_aggregation_solver
+        np.random.seed(1409871560)
+
+        A = poisson((40, 40), format='csr').astype(np.float32)
+        ml = smoothed_aggregation_solver(A, coarse_solver='splu')
+
+        # the convergence test must not stagnate above the default tolerance
+        for i in range(15):
+            b = np.random.rand(A.shape[0]).astype(np.float32)
+            residuals = []
+            ml.solve(b, residuals=residuals)
+            assert(len(residuals) <= 15)
+
+    def test_cycle_coarse_solves(self):
+        from pyamg import smoothed_aggregation_solver
+        from scipy.sparse.linalg import spsolve
+
+        calls = []
+
+        def count(A, b):
+            calls.append(1)
+            return spsolve(A.tocsr(), b)
+
+        A = poisson((100, 100), format='csr')
+        b = np.ones(A.shape[0])
+        ml = smoothed_aggregation_solver(A, max_levels=4, max_coarse=1,
+                                         coarse_solver=count)
+        assert_equal(len(ml.levels), 4)
+
+        # coarse solves per cycle, with a fixed number of levels
+        for cycle, n in [('V', 1), ('W', 4), ('F', 3)]:
+            calls[:] = []
+            ml.solve(b, maxiter=2, tol=1e-16, cycle=cycle)
+            assert_equal(len(calls), 2 * n)
+
+        assert_raises(TypeError, ml.solve, b, cycle='X')
+
+    def test_solve_out(self):
+        from pyamg import smoothed_aggregation_solver
+        np.random.seed(1832710294)
+
+        A = poisson((50, 50), format='csr')
+        b = np.random.rand(A.shape[0])
+        x0 = np.random.rand(A.shape[0])
+
+        ml = smoothed_aggregation_solver(A, max_coarse=10)
+        x = ml.solve(b, x0=x0, tol=1e-8)
+
+        # out may alias x0, which is then updated in place
+        out = x0.copy()
+        y = ml.solve(b, x0=out, tol=1e-8, out=out)
+        assert_array_almost_equal(out, x)
+        assert(np.shares_memory(y, out))
+
+        x = ml.solve(b, x0=x0, tol=1e-8, accel='cg')
+        out = np.empty_like(b)
+        ml.solve(b, x0=x0, tol=1e-8, accel='cg', out=out)
+        assert_array_almost_equal(out, x)
+
+        # an out of the wrong type is rejected before it is written to
+        out = np.zeros(A.shape[0], dtype=np.float32)
+        assert_raises(ValueError, ml.solve, b, x0=x0, out=out)
+        assert_equal(out, 0)
+
     def test_cycle_complexity(self):
         # four levels
         levels = []
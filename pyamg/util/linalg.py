@@ -7,6 +7,7 @@ import scipy as sp
 import scipy.sparse as sparse
 from scipy.linalg.lapack import get_lapack_funcs
 from scipy.linalg.lapack import _compute_lwork
+from pyamg import amg_core
 
 __all__ = ['approximate_spectral_radius', 'infinity_norm', 'norm',
            'residual_norm', 'condest', 'cond', 'ishermitian',
@@ -104,8 +105,25 @@ def infinity_norm(A):
 
 
 def residual_norm(A, x, b):
-    """Compute ||b - A*x||."""
-    return norm(np.ravel(b) - A*np.ravel(x))
+    """Compute ||b - A*x||.
+
+    For double precision CSR matrices whose type matches x and b, the residual
+    and its norm are computed in a single pass, without forming b - A*x.
+    Single precision is left to NumPy, whose residual is more accurate than a
+    single precision running sum and keeps the convergence test of float32
+    solves from stagnating above the tolerance.
+    """
+    x = np.ravel(x)
+    b = np.ravel(b)
+
+    if sparse.isspmatrix_csr(A) and \
+            A.dtype == x.dtype == b.dtype and A.dtype.char in 'dD' and \
+            A.indptr.dtype == A.indices.dtype == np.intc and \
+            (b.shape[0], x.shape[0]) == A.shape:
+        return amg_core.csr_residual_norm(A.shape[0], A.indptr, A.indices,
+                                          A.data, x, b)
+
+    return norm(b - A*x)
 
 
 def axpy(x, y, a=1.0):
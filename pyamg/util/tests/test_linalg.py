@@ -4,7 +4,7 @@ from scipy.sparse import csr_matrix
 from scipy.linalg import svd, eigvals
 
 from pyamg.util.linalg import approximate_spectral_radius,\
-    infinity_norm, norm, condest, cond,\
+    infinity_norm, norm, residual_norm, condest, cond,\
     ishermitian, pinv_array
 
 from pyamg import gallery
@@ -28,6 +28,25 @@ class TestLinalg(TestCase):
         for A in cases:
             assert_almost_equal(norm(A), linalg.norm(A))
 
+    def test_residual_norm(self):
+        np.random.seed(3017541218)
+        A = gallery.poisson((10, 10), format='csr')
+        A.data = A.data + np.random.rand(A.nnz)
+
+        for dtype in [np.float32, np.float64, np.complex64, np.complex128]:
+            x = np.random.rand(A.shape[0]).astype(dtype)
+            b = np.random.rand(A.shape[0]).astype(dtype)
+            if np.iscomplexobj(x):
+                x += 1.0j * np.random.rand(A.shape[0])
+                b -= 2.0j * np.random.rand(A.shape[0])
+            for M in [A, A.tobsr(blocksize=(2, 2)),
+                      A.tobsr(blocksize=(4, 2)), A.tocoo()]:
+                M = M.astype(dtype)
+                expected = linalg.norm(b - M*x)
+                decimal = 4 if dtype in [np.float32, np.complex64] else 10
+                assert_almost_equal(residual_norm(M, x, b) / expected, 1.0,
+                                    decimal=decimal)
+
     def test_approximate_spectral_radius(self):
         np.random.seed(3456)
         cases = []
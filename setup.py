@@ -193,6 +193,10 @@ class BuildExt(build_ext):
             c_opts.append(cpp_flag(self.compiler))
             if has_flag(self.compiler, '-fvisibility=hidden'):
                 c_opts.append('-fvisibility=hidden')
+            # OpenMP is optional; amg_core runs serially without it
+            if has_flag(self.compiler, '-fopenmp'):
+                c_opts.append('-fopenmp')
+                l_opts.append('-fopenmp')
 
         for ext in self.extensions:
             ext.extra_compile_args = c_opts